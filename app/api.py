@@ -1,9 +1,14 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, request, jsonify
 from .generator import generate_passwords_from_rule, parse_rule, parse_date, generate_numbers_from_date
+from .downloads import wordlist_writer, read_etag, file_etag, read_line_range, send_range
 import os
 
 api_bp = Blueprint("api", __name__)
 
+def get_output_path():
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    return os.path.join(base_dir, "output", "passwords.txt")
+
 @api_bp.route("/generate", methods=["POST"])
 def generate():
     data = request.get_json()
@@ -25,7 +30,7 @@ def generate():
     password_limit = data.get("password_limit", 1000000)
 
     rules_path = "rules/rules.txt"
-    output_path = "output/passwords.txt"
+    output_path = get_output_path()
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
@@ -49,7 +54,7 @@ def generate():
     total_written = 0
     preview_passwords = []
 
-    with open(output_path, "w", encoding="utf-8") as outfile:
+    with wordlist_writer(output_path) as write_line:
         for rule_str in rules:
             if total_written >= password_limit:
                 break
@@ -70,7 +75,7 @@ def generate():
                 if max_length and len(pwd) > max_length:
                     continue
 
-                outfile.write(pwd + "\n")
+                write_line(pwd)
                 if len(preview_passwords) < 100:
                     preview_passwords.append(pwd)
                 total_written += 1
@@ -82,13 +87,60 @@ def generate():
 
 @api_bp.route("/download", methods=["GET"])
 def download_passwords():
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    output_path = os.path.join(base_dir, "output", "passwords.txt")
+    output_path = get_output_path()
+    is_slice = "start_line" in request.args or "count" in request.args
+
+    start_line = request.args.get("start_line", type=int)
+    count = request.args.get("count", type=int)
 
-    if not os.path.exists(output_path):
+    if "start_line" not in request.args:
+        start_line = 0
+    elif start_line is None or start_line < 0:
+        return jsonify({"error": "'start_line' must be a non-negative integer."}), 400
+
+    if "count" in request.args and (count is None or count < 0):
+        return jsonify({"error": "'count' must be a non-negative integer."}), 400
+
+    try:
+        f = open(output_path, "rb")
+    except FileNotFoundError:
         return jsonify({"error": "No password file found."}), 404
 
-    return send_file(output_path, as_attachment=True, download_name="passwords.txt")
+    response = None
+    try:
+        file_size = os.fstat(f.fileno()).st_size
+
+        if not is_slice:
+            response = send_range(
+                request, f, 0, file_size, read_etag(output_path, f) or file_etag(f), "passwords.txt"
+            )
+            return response
+
+        # Read the index before the ETag: a content ETag that matches the
+        # open file is only on disk while that file's index is too
+        line_range = read_line_range(output_path, start_line, count, file_size)
+        etag = read_etag(output_path, f)
+
+        if etag is None:
+            return jsonify({"error": "No content ETag found. Regenerate the password file."}), 404
+
+        if line_range is None:
+            return jsonify({"error": "No valid line index found. Regenerate the password file."}), 404
+
+        start, end, total_lines = line_range
+        if start_line > total_lines:
+            return jsonify({"error": f"'start_line' is past the end of the file ({total_lines} lines)."}), 400
+
+        response = send_range(
+            request, f, start, end,
+            f"{etag}-{start_line}-{count if count is not None else 'end'}",
+            f"passwords_{start_line}.txt"
+        )
+        response.headers["X-Total-Lines"] = str(total_lines)
+        return response
+    finally:
+        if response is None:
+            f.close()
 
 @api_bp.route("/health", methods=["GET"])
 def health():
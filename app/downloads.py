@@ -0,0 +1,185 @@
+from flask import Response
+from contextlib import contextmanager
+import fcntl
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+
+# Side files kept next to the generated wordlist
+INDEX_SUFFIX = ".idx"    # byte offset of every line start, then the file size
+ETAG_SUFFIX = ".etag"    # content hash and the identity of the file it describes
+LOCK_SUFFIX = ".lock"
+
+OFFSET = struct.Struct("Q")
+
+@contextmanager
+def generation_lock(output_path):
+    """
+    Hold an exclusive lock so only one worker writes the wordlist at a time.
+    """
+    with open(output_path + LOCK_SUFFIX, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+@contextmanager
+def atomic_write(path):
+    """
+    Write to a temporary file and move it over `path` once the block succeeds.
+    """
+    tmp_path = f"{path}.{secrets.token_hex(8)}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@contextmanager
+def wordlist_writer(output_path):
+    """
+    Yield a function that appends a line to the wordlist, writing its line
+    index as it goes and its ETag once the wordlist is in place.
+    """
+    content_hash = hashlib.sha256()
+
+    with generation_lock(output_path):
+        # The ETag goes first and comes back last, so it only ever exists
+        # while the wordlist and index it was written with are on disk.
+        # The index is moved into place before the wordlist.
+        for suffix in (ETAG_SUFFIX, INDEX_SUFFIX):
+            try:
+                os.remove(output_path + suffix)
+            except FileNotFoundError:
+                pass
+
+        with atomic_write(output_path) as outfile, atomic_write(output_path + INDEX_SUFFIX) as index_file:
+            offset = 0
+            index_file.write(OFFSET.pack(offset))
+
+            def write_line(line):
+                nonlocal offset
+                data = (line + "\n").encode("utf-8")
+                outfile.write(data)
+                content_hash.update(data)
+                offset += len(data)
+                index_file.write(OFFSET.pack(offset))
+
+            yield write_line
+
+        stat = os.stat(output_path)
+        with atomic_write(output_path + ETAG_SUFFIX) as etag_file:
+            etag_file.write(
+                f"{content_hash.hexdigest()} {stat.st_ino} {stat.st_size} {stat.st_mtime_ns}\n".encode("ascii")
+            )
+
+def file_etag(f):
+    """
+    ETag derived from the identity of the open file, used when no content ETag is available.
+    """
+    stat = os.fstat(f.fileno())
+    return f"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+def read_etag(output_path, f):
+    """
+    Return the content ETag if it was written for the open wordlist `f`, else None.
+    """
+    try:
+        with open(output_path + ETAG_SUFFIX, "r", encoding="ascii") as etag_file:
+            digest, ino, size, mtime_ns = etag_file.read().split()
+            identity = (int(ino), int(size), int(mtime_ns))
+    except (OSError, ValueError):
+        return None
+
+    stat = os.fstat(f.fileno())
+    if identity != (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+        return None
+    return digest
+
+def read_line_range(output_path, start_line, count, file_size):
+    """
+    Return (start, end, total_lines) for `count` lines from `start_line`,
+    or None if the index is missing or does not fit a file of `file_size` bytes.
+    """
+    try:
+        f = open(output_path + INDEX_SUFFIX, "rb")
+    except OSError:
+        return None
+
+    with f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None  # Empty index file
+
+        with mm:
+            try:
+                offsets = memoryview(mm).cast("Q")
+            except TypeError:
+                return None  # Truncated index file
+
+            try:
+                if offsets[0] != 0 or offsets[-1] != file_size:
+                    return None
+                total_lines = len(offsets) - 1
+                start_line = min(start_line, total_lines)
+                end_line = total_lines if count is None else min(start_line + count, total_lines)
+                return offsets[start_line], offsets[end_line], total_lines
+            finally:
+                offsets.release()
+
+class FileSlice:
+    """
+    Stream bytes `start` to `end` of an open file; seeks are relative to `start`.
+    """
+
+    def __init__(self, f, start, end, buffer_size=8192):
+        self.f = f
+        self.start = start
+        self.end = end
+        self.buffer_size = buffer_size
+        self.f.seek(start)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        remaining = self.end - self.f.tell()
+        if remaining <= 0:
+            raise StopIteration()
+        chunk = self.f.read(min(self.buffer_size, remaining))
+        if not chunk:
+            raise StopIteration()
+        return chunk
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset):
+        self.f.seek(self.start + min(offset, self.end - self.start))
+
+    def tell(self):
+        return self.f.tell() - self.start
+
+    def close(self):
+        self.f.close()
+
+def send_range(request, f, start, end, etag, download_name):
+    """
+    Stream a byte range of `f` as an attachment, honouring Range, If-Range and If-None-Match.
+    """
+    response = Response(FileSlice(f, start, end), mimetype="text/plain", direct_passthrough=True)
+    response.content_length = end - start
+    response.headers["Content-Disposition"] = f"attachment; filename={download_name}"
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response.make_conditional(request, accept_ranges=True, complete_length=end - start)
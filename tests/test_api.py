@@ -0,0 +1,209 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+from app import api, create_app, downloads
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def output_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "passwords.txt")
+    monkeypatch.setattr(api, "get_output_path", lambda: path)
+    monkeypatch.chdir(REPO_ROOT)  # generate() reads rules/rules.txt
+    return path
+
+
+@pytest.fixture
+def client(output_path):
+    app = create_app()
+    app.testing = True
+    return app.test_client()
+
+
+@pytest.fixture
+def generated(client, output_path):
+    response = client.post("/api/generate", json={
+        "strings": ["alice", "bob"],
+        "numbers": ["42"],
+        "password_limit": 500,
+    })
+    assert response.status_code == 200
+    with open(output_path, "rb") as f:
+        return f.read()
+
+
+def test_slices_match_file_lines(client, generated):
+    lines = generated.splitlines(keepends=True)
+
+    for start_line, count in [(0, 3), (10, 25), (490, 20), (len(lines), 5)]:
+        response = client.get(f"/api/download?start_line={start_line}&count={count}")
+        assert response.status_code == 200
+        assert response.data == b"".join(lines[start_line:start_line + count])
+        assert response.headers["X-Total-Lines"] == str(len(lines))
+
+    response = client.get("/api/download?start_line=100")
+    assert response.data == b"".join(lines[100:])
+
+
+def test_full_download_etag_is_content_hash(client, generated, output_path):
+    response = client.get("/api/download")
+    assert response.status_code == 200
+    assert response.data == generated
+
+    assert response.get_etag() == (hashlib.sha256(generated).hexdigest(), False)
+
+
+@pytest.mark.parametrize("query", ["", "?start_line=5&count=50"])
+def test_if_range_resume(client, generated, query):
+    etag = client.get(f"/api/download{query}").headers["ETag"]
+
+    response = client.get(f"/api/download{query}", headers={"Range": "bytes=10-", "If-Range": etag})
+    assert response.status_code == 206
+    assert response.headers["Content-Range"].startswith("bytes 10-")
+    full = client.get(f"/api/download{query}").data
+    assert response.data == full[10:]
+
+    response = client.get(f"/api/download{query}", headers={"Range": "bytes=10-", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.data == full
+
+
+@pytest.mark.parametrize("query", ["", "?start_line=5&count=50"])
+def test_if_none_match(client, generated, query):
+    etag = client.get(f"/api/download{query}").headers["ETag"]
+
+    response = client.get(f"/api/download{query}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("query", [
+    "?start_line=abc&count=2",
+    "?start_line=&count=2",
+    "?start_line=-1",
+    "?start_line=0&count=x",
+    "?start_line=0&count=-3",
+    "?start_line=100000",
+])
+def test_invalid_slice_parameters(client, generated, query):
+    assert client.get(f"/api/download{query}").status_code == 400
+
+
+@pytest.mark.parametrize("index_data", [None, b"", b"\x00" * 12, b"\x00" * 16])
+def test_missing_or_corrupt_index(client, generated, output_path, index_data):
+    os.remove(output_path + downloads.INDEX_SUFFIX)
+    if index_data is not None:
+        with open(output_path + downloads.INDEX_SUFFIX, "wb") as f:
+            f.write(index_data)
+
+    response = client.get("/api/download?start_line=0&count=2")
+    assert response.status_code == 404
+    assert "line index" in response.get_json()["error"]
+
+
+def test_missing_etag(client, generated, output_path):
+    os.remove(output_path + downloads.ETAG_SUFFIX)
+
+    response = client.get("/api/download?start_line=0&count=2")
+    assert response.status_code == 404
+    assert "ETag" in response.get_json()["error"]
+
+    # Full downloads fall back to werkzeug's own ETag
+    assert client.get("/api/download").status_code == 200
+
+
+def test_failed_generate_keeps_previous_wordlist(client, generated, output_path, monkeypatch):
+    old_etag = client.get("/api/download").headers["ETag"]
+    real_generate = api.generate_passwords_from_rule
+    calls = []
+
+    def failing_generate(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 3:
+            raise RuntimeError("generation failed")
+        return real_generate(*args, **kwargs)
+
+    monkeypatch.setattr(api, "generate_passwords_from_rule", failing_generate)
+
+    with pytest.raises(RuntimeError):
+        client.post("/api/generate", json={"strings": ["carol"]})
+
+    assert not os.path.exists(output_path + downloads.ETAG_SUFFIX)
+    assert not os.path.exists(output_path + downloads.INDEX_SUFFIX)
+    assert not [name for name in os.listdir(os.path.dirname(output_path)) if name.endswith(".tmp")]
+
+    response = client.get("/api/download")
+    assert response.data == generated
+    assert response.headers["ETag"] != old_etag
+
+
+def test_etag_is_not_reused_for_same_size_wordlist(client, output_path):
+    client.post("/api/generate", json={"strings": ["alice"]})
+    stale_etag = client.get("/api/download").headers["ETag"]
+    stale_size = os.path.getsize(output_path)
+    with open(output_path + downloads.ETAG_SUFFIX, "rb") as f:
+        stale_etag_file = f.read()
+
+    client.post("/api/generate", json={"strings": ["bobby"]})
+    assert os.path.getsize(output_path) == stale_size
+
+    # Simulate the ETag of the previous run still being on disk
+    with open(output_path + downloads.ETAG_SUFFIX, "wb") as f:
+        f.write(stale_etag_file)
+
+    response = client.get("/api/download", headers={"Range": "bytes=10-", "If-Range": stale_etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != stale_etag
+    assert client.get("/api/download?start_line=0&count=2").status_code == 404
+
+
+def test_concurrent_generates_are_serialized(client, output_path, monkeypatch):
+    real_generate = api.generate_passwords_from_rule
+    first_started = threading.Event()
+    release_first = threading.Event()
+
+    def slow_generate(rule, strings, *args, **kwargs):
+        if strings == ["alice"] and not first_started.is_set():
+            first_started.set()
+            release_first.wait(5)
+        return real_generate(rule, strings, *args, **kwargs)
+
+    monkeypatch.setattr(api, "generate_passwords_from_rule", slow_generate)
+
+    def post(strings):
+        assert client.application.test_client().post("/api/generate", json={"strings": strings}).status_code == 200
+
+    first = threading.Thread(target=post, args=(["alice"],))
+    second = threading.Thread(target=post, args=(["bobby"],))
+    first.start()
+    assert first_started.wait(5)
+    second.start()
+
+    second.join(0.5)
+    assert second.is_alive()  # Blocked on the generation lock
+
+    release_first.set()
+    first.join(5)
+    second.join(5)
+
+    with open(output_path, "rb") as f:
+        content = f.read()
+    assert b"bobby" in content and b"alice" not in content
+
+    response = client.get("/api/download")
+    assert response.get_etag() == (hashlib.sha256(content).hexdigest(), False)
+
+    lines = content.splitlines(keepends=True)
+    response = client.get(f"/api/download?start_line=1&count={len(lines)}")
+    assert response.data == b"".join(lines[1:])
+
+
+def test_generated_files_use_umask_permissions(client, generated, output_path):
+    umask = os.umask(0)
+    os.umask(umask)
+
+    for suffix in ("", downloads.INDEX_SUFFIX, downloads.ETAG_SUFFIX):
+        assert os.stat(output_path + suffix).st_mode & 0o777 == 0o666 & ~umask